@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import fcntl
+import argparse
+import getpass
+import logging
+from selenium import webdriver
+from selenium.webdriver.firefox.options import Options
+import config
+from progress import setup_logging, add_verbosity_arguments, get_verbosity
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    logging.warning("python-dotenv not installed. Install with: pip install python-dotenv")
+
+
+class AttachedRemote(webdriver.Remote):
+    # Reuses a session that already exists in a running geckodriver instead of creating a new one
+    def __init__(self, command_executor, session_id):
+        self.attach_session_id = session_id
+        super().__init__(command_executor=command_executor, options=Options())
+
+    def start_session(self, capabilities):
+        self.session_id = self.attach_session_id
+        self.caps = {}
+
+
+def get_lock_path(index):
+    return os.path.join(config.STATE_DIR, f"browser-{index}.lock")
+
+
+def read_state():
+    try:
+        with open(config.DAEMON_STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def acquire_slot_lock(index):
+    lock_file = open(get_lock_path(index), 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+def release_slot_lock(lock_file):
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        lock_file.close()
+
+
+def attach_to_daemon():
+    state = read_state()
+    if not state:
+        logging.warning(f"No browser daemon state found at {config.DAEMON_STATE_FILE}")
+        return None
+
+    for browser in state["browsers"]:
+        lock_file = acquire_slot_lock(browser["index"])
+        if not lock_file:
+            logging.debug("Daemon browser %d is in use", browser["index"])
+            continue
+        try:
+            driver = AttachedRemote(browser["executor_url"], browser["session_id"])
+            # Fails fast if the daemon restarted or the session is gone
+            driver.current_url
+            logging.info(f"Attached to daemon browser {browser['index']} at {browser['executor_url']}")
+            return driver, lock_file
+        except Exception:
+            logging.warning(f"Daemon browser {browser['index']} is not reachable", exc_info=True)
+            release_slot_lock(lock_file)
+
+    logging.warning("No free daemon browser available")
+    return None
+
+
+class BrowserDaemon:
+    def __init__(self, browsers=1, headless=True):
+        self.browser_count = browsers
+        self.headless = headless
+        self.slots = []
+
+    def start(self, email, password):
+        # Imported here so the extractors can import attach_to_daemon without a cycle
+        from linkedin_extractor import LinkedInExtractor
+
+        os.makedirs(config.STATE_DIR, exist_ok=True)
+        for index in range(self.browser_count):
+            logging.info(f"Starting daemon browser {index}...")
+            slot = LinkedInExtractor(headless=self.headless)
+            slot.email = email
+            slot.password = password
+            slot.setup_driver()
+            slot.login(email, password)
+            self.slots.append(slot)
+        self.write_state()
+
+    def write_state(self):
+        state = {
+            "pid": os.getpid(),
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "browsers": [
+                {
+                    "index": index,
+                    "executor_url": slot.driver.service.service_url,
+                    "session_id": slot.driver.session_id
+                }
+                for index, slot in enumerate(self.slots)
+            ]
+        }
+        # Write and rename so clients never read a half written file
+        temp_file = config.DAEMON_STATE_FILE + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_file, config.DAEMON_STATE_FILE)
+        logging.info(f"Daemon state written to {config.DAEMON_STATE_FILE}")
+
+    def check_browsers(self):
+        for index, slot in enumerate(self.slots):
+            # Only browsers no client is attached to can be checked and recycled
+            lock_file = acquire_slot_lock(index)
+            if not lock_file:
+                continue
+            try:
+                recycle_reason = slot.watchdog.check()
+                if recycle_reason:
+                    slot.watchdog.recycle(recycle_reason)
+                    self.write_state()
+            except Exception:
+                logging.error(f"Failed to recycle daemon browser {index}", exc_info=True)
+            finally:
+                release_slot_lock(lock_file)
+
+    def serve_forever(self):
+        logging.info(f"Browser daemon ready with {len(self.slots)} browsers. Press Ctrl+C to stop.")
+        while True:
+            time.sleep(config.DAEMON_HEALTH_CHECK_INTERVAL)
+            self.check_browsers()
+
+    def shutdown(self):
+        logging.info("Shutting down browser daemon")
+        for slot in self.slots:
+            try:
+                slot.driver.quit()
+            except Exception:
+                logging.warning("Failed to quit daemon browser", exc_info=True)
+        try:
+            os.remove(config.DAEMON_STATE_FILE)
+        except OSError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep warm, logged-in browsers that the extractors can attach to")
+    parser.add_argument("--browsers", type=int, default=1, help="Number of browsers to keep running")
+    parser.add_argument("--show-browser", action="store_true", help="Run browsers with a visible window")
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging(get_verbosity(args))
+
+    # Try to get credentials from environment variables
+    email = os.getenv('LINKEDIN_EMAIL')
+    password = os.getenv('LINKEDIN_PASSWORD')
+
+    if email and password:
+        logging.info("Using credentials from .env file")
+    else:
+        logging.info("No .env file found or credentials missing, asking for manual input")
+        if not email:
+            email = input("Enter your LinkedIn email: ")
+        if not password:
+            password = getpass.getpass("Enter your LinkedIn password: ")
+
+    daemon = BrowserDaemon(browsers=args.browsers, headless=not args.show_browser)
+    try:
+        daemon.start(email, password)
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+
+if __name__ == "__main__":
+    main()
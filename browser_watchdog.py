@@ -0,0 +1,117 @@
+import os
+import time
+import logging
+import config
+
+
+class BrowserWatchdog:
+    def __init__(self, extractor, max_rss_mb=None, max_response_time=None):
+        self.extractor = extractor
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else config.WATCHDOG_MAX_RSS_MB
+        self.max_response_time = max_response_time if max_response_time is not None else config.WATCHDOG_MAX_RESPONSE_TIME
+        self.last_url = None
+        self.recycles = []
+        self.enabled = True
+        self.rss_unavailable_logged = False
+
+    def get_browser_pid(self):
+        try:
+            return self.extractor.driver.capabilities.get("moz:processID")
+        except Exception:
+            return None
+
+    def get_browser_rss_mb(self):
+        # Firefox spreads its memory over content processes, so sum the whole process tree
+        pid = self.get_browser_pid()
+        if not pid or not os.path.isdir("/proc"):
+            return None
+
+        children = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    stat = f.read()
+                # The command name may contain spaces, the ppid is the second field after it
+                ppid = int(stat.rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+
+        total_kb = 0
+        pending = [pid]
+        while pending:
+            current = pending.pop()
+            try:
+                with open(f"/proc/{current}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total_kb += int(line.split()[1])
+                            break
+            except (OSError, ValueError):
+                pass
+            pending.extend(children.get(current, []))
+
+        return total_kb / 1024
+
+    def measure_response_time(self):
+        start = time.monotonic()
+        self.extractor.driver.execute_script("return document.readyState")
+        return time.monotonic() - start
+
+    def check(self):
+        if not self.enabled:
+            return None
+
+        try:
+            self.last_url = self.extractor.driver.current_url
+            response_time = self.measure_response_time()
+        except Exception as e:
+            return f"browser unresponsive ({e.__class__.__name__})"
+
+        if response_time > self.max_response_time:
+            return f"slow response ({response_time:.1f}s > {self.max_response_time}s)"
+
+        rss_mb = self.get_browser_rss_mb()
+        if rss_mb is None and not self.rss_unavailable_logged:
+            logging.warning("Browser memory usage cannot be measured here (needs Linux /proc and the "
+                            "moz:processID capability), only unresponsive browsers will be relaunched")
+            self.rss_unavailable_logged = True
+        if rss_mb is not None:
+            logging.debug(f"Browser RSS: {rss_mb:.0f} MB, response time: {response_time:.2f}s")
+            if rss_mb > self.max_rss_mb:
+                return f"memory usage {rss_mb:.0f} MB > {self.max_rss_mb} MB"
+
+        return None
+
+    def recycle(self, reason):
+        logging.warning(f"Recycling browser: {reason}")
+        resume_url = self.last_url
+
+        try:
+            self.extractor.driver.quit()
+        except Exception:
+            logging.warning("Failed to quit browser cleanly, continuing with relaunch", exc_info=True)
+
+        start = time.monotonic()
+        self.extractor.setup_driver()
+        self.extractor.login(self.extractor.email, self.extractor.password)
+        if resume_url:
+            logging.info(f"Restoring page after recycle: {resume_url}")
+            self.extractor.driver.get(resume_url)
+
+        self.recycles.append({
+            "reason": reason,
+            "resume_url": resume_url,
+            "recycled_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_seconds": round(time.monotonic() - start, 1)
+        })
+        logging.info(f"Browser recycled ({len(self.recycles)} so far this run)")
+
+    def check_and_recycle(self):
+        reason = self.check()
+        if reason:
+            self.recycle(reason)
+            return True
+        return False
@@ -3,10 +3,57 @@ from datetime import datetime
 
 LOGIN_URL = "https://www.linkedin.com/login"
 CONNECTIONS_URL = "https://www.linkedin.com/mynetwork/invite-connect/connections/"
+PEOPLE_SEARCH_URL = "https://www.linkedin.com/search/results/people/"
+FEED_URL = "https://www.linkedin.com/feed/"
 
 WAIT_TIMEOUT = 10
+# Initial page load estimate, replaced by observed latencies once the run has a few samples
 SCROLL_PAUSE_TIME = 5
-MAX_SCROLL_ATTEMPTS = 10
+
+# Adaptive waits: pause for a percentile of recently observed load latencies
+ADAPTIVE_WAIT_PERCENTILE = 90
+ADAPTIVE_WAIT_WINDOW = 30
+ADAPTIVE_WAIT_SAFETY_FACTOR = 2
+ADAPTIVE_WAIT_MIN_TIMEOUT = 1
+ADAPTIVE_WAIT_MAX_TIMEOUT = 30
+ADAPTIVE_WAIT_POLL_INTERVAL = 0.25
+# A timed out wait doubles the next timeout, successful waits relax it again
+ADAPTIVE_WAIT_TIMEOUT_GROWTH = 2
+ADAPTIVE_WAIT_FLOOR_DECAY = 0.75
+
+# Scroll attempt budgets are derived from the expected total on the page
+ADAPTIVE_DEFAULT_BATCH_SIZE = 10
+ADAPTIVE_ATTEMPT_SLACK = 1.5
+STALL_ATTEMPTS = 3
+# LinkedIn's connection limit, used when the page does not show a total
+MAX_EXPECTED_TOTAL = 30000
+
+# Browser watchdog: recycle the driver when Firefox grows past these limits
+WATCHDOG_MAX_RSS_MB = 2048
+WATCHDOG_MAX_RESPONSE_TIME = 15
+
+# Local state shared between runs
+STATE_DIR = os.path.expanduser("~/.linkedin_extractor")
+
+# Browser daemon: state shared between the daemon and attaching CLIs
+DAEMON_STATE_FILE = os.path.join(STATE_DIR, "daemon.json")
+DAEMON_HEALTH_CHECK_INTERVAL = 60
+
+# Profile enrichment: browsers visiting profiles in parallel and the on-disk cache of their details
+ENRICH_WORKERS = 2
+ENRICH_CACHE_DIR = os.path.join(STATE_DIR, "profile_cache")
+ENRICH_CACHE_TTL = 7 * 24 * 3600
+ENRICH_CACHE_MAX_ENTRIES = 50000
+
+# Sharded extraction: workers share one budget of page requests
+SHARD_WORKERS = 2
+SHARD_MAX_REQUESTS = 500
+SHARD_MIN_REQUEST_INTERVAL = 2
+# People search stops returning results after 100 pages of 10
+SEARCH_RESULT_LIMIT = 1000
+
+# Minimum seconds between progress status updates
+PROGRESS_INTERVAL = 2
 
 def get_output_filename():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,8 @@
+class VerificationCodeRequired(Exception):
+    # LinkedIn asked for a verification code and there is no way to get one without prompting
+    pass
+
+
+class FirefoxNotFound(Exception):
+    # Raised instead of exiting so library callers can handle a missing browser
+    pass
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+import json
+import argparse
+import logging
+from progress import setup_logging, add_verbosity_arguments, get_verbosity
+
+RECORD_KEYS = ("contacts", "connections")
+
+# Compact format: a header line with the export metadata, then one record per line
+JSONL_FORMAT = "linkedin-extractor-jsonl"
+JSONL_VERSION = 1
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class ExportReader:
+    # Reads exports written by save_to_file one record at a time, so memory use
+    # depends on the largest record rather than on the size of the file
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.format = None
+        self.records_key = None
+        self.metadata = {}
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.in_records = False
+
+    def __enter__(self):
+        self.file = open(self.path, encoding='utf-8')
+        header = self.read_jsonl_header()
+        if header is not None:
+            self.format = "jsonl"
+            self.records_key = header.pop("records_key", None)
+            self.metadata = header
+        else:
+            self.format = "json"
+            self.file.seek(0)
+            if self.skip_whitespace() != "{":
+                raise ValueError(f"{self.path} is not an export file")
+            self.pos += 1
+            # Metadata precedes the record array, so it is available before iterating
+            self.in_records = self.seek_records()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+
+    def __iter__(self):
+        if self.format == "jsonl":
+            for line in self.file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        while self.in_records:
+            yield from self.iter_array()
+            self.in_records = self.seek_records()
+
+    def read_jsonl_header(self):
+        first_line = self.file.readline(CHUNK_SIZE)
+        try:
+            header = json.loads(first_line)
+        except ValueError:
+            return None
+        if isinstance(header, dict) and header.pop("format", None) == JSONL_FORMAT:
+            header.pop("version", None)
+            return header
+        return None
+
+    def fill(self):
+        chunk = self.file.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char):
+        if self.skip_whitespace() != char:
+            raise ValueError(f"Malformed export {self.path}: expected '{char}' near offset {self.pos}")
+        self.pos += 1
+
+    def decode_value(self):
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def seek_records(self):
+        # Parses top-level keys into metadata until the next record array starts
+        while True:
+            char = self.skip_whitespace()
+            if char is None or char == "}":
+                return False
+            if char == ",":
+                self.pos += 1
+                continue
+
+            key = self.decode_value()
+            self.expect(":")
+            if key in RECORD_KEYS and self.skip_whitespace() == "[":
+                self.pos += 1
+                self.records_key = key
+                return True
+            self.metadata[key] = self.decode_value()
+
+    def iter_array(self):
+        if self.skip_whitespace() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            char = self.skip_whitespace()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed export {self.path}: expected ',' or ']' near offset {self.pos}")
+
+
+def iter_records(path):
+    with ExportReader(path) as reader:
+        yield from reader
+
+
+def convert_export(input_file, output_file):
+    try:
+        logging.info(f"Converting {input_file} to {output_file}...")
+        count = 0
+        with ExportReader(input_file) as reader, open(output_file, 'w', encoding='utf-8') as f:
+            header = {"format": JSONL_FORMAT, "version": JSONL_VERSION, "records_key": reader.records_key}
+            header.update(reader.metadata)
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+            for record in reader:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+                count += 1
+
+        logging.info(f"Wrote {count} records to {output_file}")
+        return count
+
+    except Exception as e:
+        logging.error(f"Failed to convert {input_file}", exc_info=True)
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an export file to the compact one-record-per-line format")
+    parser.add_argument("input_file", help="Export JSON file written by one of the extractors")
+    parser.add_argument("output_file", help="Output JSON Lines file")
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging(get_verbosity(args))
+
+    convert_export(args.input_file, args.output_file)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 import json
+import math
 import time
 import argparse
 import getpass
 import logging
-import sys
 import shutil
 import os
 from selenium import webdriver
@@ -15,6 +15,12 @@ from selenium.webdriver.firefox.options import Options
 from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.firefox.service import Service
 import config
+from errors import VerificationCodeRequired, FirefoxNotFound
+from browser_watchdog import BrowserWatchdog
+from browser_daemon import attach_to_daemon, release_slot_lock
+from profile_urls import canonicalize_profile_url
+from progress import ProgressReporter, setup_logging, add_verbosity_arguments, get_verbosity
+from wait_controller import AdaptiveWaitController, parse_count
 
 try:
     from dotenv import load_dotenv
@@ -22,16 +28,34 @@ try:
 except ImportError:
     logging.warning("python-dotenv not installed. Install with: pip install python-dotenv")
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 class LinkedInExtractor:
-    def __init__(self, headless=False, keep_browser_open=False):
+    def __init__(self, headless=False, keep_browser_open=False, max_browser_memory_mb=None,
+                 verification_code_callback=None, attach=False):
         self.driver = None
         self.headless = headless
         self.keep_browser_open = keep_browser_open
+        self.verification_code_callback = verification_code_callback
+        self.interactive = True
+        self.attach = attach
+        self.daemon_lock = None
         self.connections = []
+        self.seen_profile_urls = set()
+        self.email = None
+        self.password = None
+        self.watchdog = BrowserWatchdog(self, max_rss_mb=max_browser_memory_mb)
+        self.metrics = {"browser_recycles": self.watchdog.recycles}
+        self.wait_controller = AdaptiveWaitController()
         
     def setup_driver(self):
+        if self.attach:
+            attached = attach_to_daemon()
+            if attached:
+                self.driver, self.daemon_lock = attached
+                # The daemon keeps its own browsers healthy
+                self.watchdog.enabled = False
+                return
+            logging.warning("Falling back to launching a new browser")
+            
         try:
             logging.info("Setting up Firefox driver...")
             
@@ -50,8 +74,7 @@ class LinkedInExtractor:
                     break
             
             if not firefox_binary:
-                logging.error("Firefox not found. Please install Firefox browser.")
-                sys.exit(1)
+                raise FirefoxNotFound("Firefox not found. Please install Firefox browser.")
             
             logging.info(f"Using Firefox binary: {firefox_binary}")
             
@@ -72,7 +95,18 @@ class LinkedInExtractor:
             logging.error("Failed to setup Firefox driver", exc_info=True)
             raise
         
+    def get_verification_code(self):
+        if self.verification_code_callback:
+            return self.verification_code_callback()
+        if not self.interactive:
+            raise VerificationCodeRequired("Verification code required but no verification_code_callback was given")
+        return input("Enter the verification code: ")
+        
     def login(self, email, password):
+        if self.daemon_lock and self.driver.get_cookie("li_at"):
+            logging.info("Attached browser is already logged in")
+            return
+            
         try:
             logging.info("Navigating to LinkedIn login page...")
             self.driver.get(config.LOGIN_URL)
@@ -92,14 +126,17 @@ class LinkedInExtractor:
             
             # Check for verification code requirement
             try:
-                # Wait a bit to see if verification is required
-                time.sleep(3)
+                # Wait until either the verification form or the logged in page shows up
+                self.wait_controller.wait_until(
+                    lambda: self.driver.find_elements(By.CSS_SELECTOR, "input[name='pin']")
+                    or self.driver.find_elements(By.CLASS_NAME, "global-nav"),
+                    kind="login")
                 
                 # Check for verification code input field
                 verification_elements = self.driver.find_elements(By.CSS_SELECTOR, "input[name='pin']")
                 if verification_elements:
                     logging.info("Verification code required. Please check your email/phone for the code.")
-                    verification_code = input("Enter the verification code: ")
+                    verification_code = self.get_verification_code()
                     
                     verification_field = verification_elements[0]
                     verification_field.send_keys(verification_code)
@@ -114,6 +151,9 @@ class LinkedInExtractor:
                 wait.until(EC.presence_of_element_located((By.CLASS_NAME, "global-nav")))
                 logging.info("Login successful!")
                 
+            except VerificationCodeRequired:
+                raise
+                
             except Exception as verification_error:
                 # If verification check fails, try to continue with normal login flow
                 logging.warning("Verification check failed, attempting normal login flow", exc_info=True)
@@ -137,36 +177,154 @@ class LinkedInExtractor:
             logging.error("Failed to navigate to connections page", exc_info=True)
             raise
         
-    def scroll_and_load_connections(self):
+    def get_expected_connection_count(self):
+        # The header reads e.g. "1,234 Connections"
+        header_selectors = [
+            ".mn-connections__header h1",
+            ".mn-connections__header",
+            "header h1"
+        ]
+        for selector in header_selectors:
+            try:
+                for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    count = parse_count(element.text)
+                    if count:
+                        return count
+            except Exception:
+                continue
+        logging.warning("Could not read the total connection count from the page")
+        return None
+        
+    def count_loaded_cards(self):
+        # Cheaper than find_elements on long lists, no element references cross the wire
+        return self.driver.execute_script("return document.querySelectorAll('.mn-connection-card').length")
+        
+    def fast_forward_connections(self, target_count):
+        logging.info(f"Scrolling back to {target_count} connections after browser recycle...")
+        loaded = self.count_loaded_cards()
+        stalls = 0
+        while loaded < target_count and stalls < config.STALL_ATTEMPTS:
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            previous = loaded
+            self.wait_controller.wait_until(lambda: self.count_loaded_cards() > previous)
+            loaded = self.count_loaded_cards()
+            stalls = stalls + 1 if loaded <= previous else 0
+        if loaded < target_count:
+            logging.warning(f"Only {loaded} of {target_count} connections reloaded after browser recycle")
+        return loaded
+        
+    def iter_connections_from_cards(self, cards):
+        for element in cards:
+            try:
+                name_element = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__name")
+                name = name_element.text.strip()
+                
+                occupation_element = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__occupation")
+                occupation = occupation_element.text.strip()
+                
+                profile_link = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__link")
+                profile_url = canonicalize_profile_url(profile_link.get_attribute("href"))
+                
+                # Cards may already have been extracted before a browser recycle
+                if profile_url in self.seen_profile_urls:
+                    continue
+                self.seen_profile_urls.add(profile_url)
+                
+                yield {
+                    "name": name,
+                    "occupation": occupation,
+                    "profile_url": profile_url
+                }
+                
+            except Exception as e:
+                logging.warning("Failed to extract data from connection element", exc_info=True)
+                continue
+        
+    def iter_scroll_connections(self):
         try:
             logging.info("Loading all connections using infinite scroll...")
             
+            expected_total = self.get_expected_connection_count()
+            if expected_total:
+                logging.info(f"Page reports {expected_total} connections")
+            
             # Get initial connection count
-            initial_connections = len(self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card"))
+            cards = self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card")
+            initial_connections = len(cards)
             logging.info(f"Initial connections visible: {initial_connections}")
+            progress = ProgressReporter("Connections", total=expected_total)
+            
+            # Cards are appended to the list as it grows, so only the tail needs parsing after each scroll
+            extracted_cards = 0
+            for connection in self.iter_connections_from_cards(cards):
+                progress.update(records=1)
+                yield connection
+            extracted_cards = len(cards)
             
             last_connection_count = initial_connections
             no_change_count = 0
             scroll_attempts = 0
+            recycled_at_count = None
             
-            while scroll_attempts < config.MAX_SCROLL_ATTEMPTS:
-                # Scroll to bottom
+            while True:
+                if expected_total and max(last_connection_count, len(self.seen_profile_urls)) >= expected_total:
+                    logging.info(f"All {expected_total} connections loaded")
+                    break
+                
+                # Re-evaluated every attempt as the observed batch size settles
+                attempt_budget = self.wait_controller.attempt_budget(expected_total)
+                if scroll_attempts >= attempt_budget:
+                    logging.warning(f"Stopping after {scroll_attempts} scroll attempts with {last_connection_count} of "
+                                    f"{expected_total or 'an unknown number of'} connections loaded")
+                    break
+                
+                recycle_reason = self.watchdog.check()
+                if recycle_reason and recycled_at_count is not None and last_connection_count <= recycled_at_count:
+                    # Re-growing the list to the same length hit the limit again, recycling cannot make progress here
+                    logging.warning(f"Browser crossed the watchdog limit again at {last_connection_count} cards "
+                                    f"({recycle_reason}), continuing without further recycles")
+                    self.watchdog.enabled = False
+                elif recycle_reason:
+                    # Infinite scroll cannot resume mid-list: the relaunched browser starts from the top,
+                    # so scroll back to where we were without re-parsing cards that were already yielded
+                    recycled_at_count = last_connection_count
+                    self.watchdog.recycle(recycle_reason)
+                    wait = WebDriverWait(self.driver, config.WAIT_TIMEOUT)
+                    wait.until(EC.presence_of_element_located((By.CLASS_NAME, "mn-connections")))
+                    last_connection_count = self.fast_forward_connections(recycled_at_count)
+                    # Keep one batch of overlap in case the list shifted while reloading, duplicates are skipped
+                    extracted_cards = max(0, min(last_connection_count, recycled_at_count) - self.wait_controller.typical_batch_size())
+                    # Re-scrolling is not progress, restart the budget from the attempts needed to get this far
+                    scroll_attempts = math.ceil(last_connection_count / self.wait_controller.typical_batch_size())
+                    no_change_count = 0
+                
+                # Scroll to bottom and wait until new cards arrive or the adaptive timeout passes
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(config.SCROLL_PAUSE_TIME)
+                # After a scroll that loaded nothing we may be at the end of the list, so a timeout is expected
+                self.wait_controller.wait_until(lambda: self.count_loaded_cards() > last_connection_count,
+                                                expect_timeout=no_change_count > 0)
                 
                 # Check current connection count
-                current_connections = len(self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card"))
+                cards = self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card")
+                current_connections = len(cards)
                 
                 if current_connections > last_connection_count:
-                    logging.info(f"New connections loaded: {current_connections} (was {last_connection_count})")
+                    logging.debug("New connections loaded: %d (was %d)", current_connections, last_connection_count)
+                    self.wait_controller.record_batch(current_connections - last_connection_count)
                     last_connection_count = current_connections
                     no_change_count = 0
                 else:
                     no_change_count += 1
-                    logging.info(f"No new connections after scroll attempt {scroll_attempts + 1}")
+                    logging.debug("No new connections after scroll attempt %d", scroll_attempts + 1)
+                
+                for connection in self.iter_connections_from_cards(cards[extracted_cards:]):
+                    progress.update(records=1)
+                    yield connection
+                extracted_cards = current_connections
+                progress.update(pages=1)
                 
-                # If no new connections for 3 consecutive attempts, we're done
-                if no_change_count >= 3:
+                # If no new connections for several consecutive attempts, we're done
+                if no_change_count >= config.STALL_ATTEMPTS:
                     logging.info(f"No new connections loaded after {no_change_count} attempts. Finished loading.")
                     break
                 
@@ -187,52 +345,43 @@ class LinkedInExtractor:
                         buttons = self.driver.find_elements(By.XPATH, selector)
                         for button in buttons:
                             if button.is_displayed() and button.is_enabled():
-                                logging.info(f"Found and clicking load more button: {button.text}")
+                                logging.debug("Found and clicking load more button: %s", button.text)
                                 self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
                                 time.sleep(1)
                                 button.click()
-                                time.sleep(config.SCROLL_PAUSE_TIME)
+                                # The broad selectors can match buttons that load nothing, keep these
+                                # waits out of the window used for scroll loads
+                                self.wait_controller.wait_until(lambda: self.count_loaded_cards() > last_connection_count,
+                                                                kind="load_more", expect_timeout=True)
                                 break
                     except:
                         continue
                 
                 scroll_attempts += 1
                 
-            final_connections = len(self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card"))
-            logging.info(f"Finished loading connections. Total visible: {final_connections} (loaded {final_connections - initial_connections} new)")
+            # Pick up anything the last load more click added
+            cards = self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card")
+            for connection in self.iter_connections_from_cards(cards[extracted_cards:]):
+                progress.update(records=1)
+                yield connection
+                
+            progress.finish()
+            logging.info(f"Finished loading connections. Total visible: {len(cards)} (loaded {len(cards) - initial_connections} new)")
                 
         except Exception as e:
             logging.error("Failed to scroll and load connections", exc_info=True)
             raise
             
+    def scroll_and_load_connections(self):
+        self.connections.extend(self.iter_scroll_connections())
+        logging.info(f"Extracted {len(self.connections)} connections")
+            
     def extract_connections(self):
         try:
             logging.info("Extracting connection data...")
             
             connection_elements = self.driver.find_elements(By.CSS_SELECTOR, ".mn-connection-card")
-            
-            for element in connection_elements:
-                try:
-                    name_element = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__name")
-                    name = name_element.text.strip()
-                    
-                    occupation_element = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__occupation")
-                    occupation = occupation_element.text.strip()
-                    
-                    profile_link = element.find_element(By.CSS_SELECTOR, ".mn-connection-card__link")
-                    profile_url = profile_link.get_attribute("href")
-                    
-                    connection_data = {
-                        "name": name,
-                        "occupation": occupation,
-                        "profile_url": profile_url
-                    }
-                    
-                    self.connections.append(connection_data)
-                    
-                except Exception as e:
-                    logging.warning("Failed to extract data from connection element", exc_info=True)
-                    continue
+            self.connections.extend(self.iter_connections_from_cards(connection_elements))
                     
             logging.info(f"Extracted {len(self.connections)} connections")
             
@@ -240,6 +389,22 @@ class LinkedInExtractor:
             logging.error("Failed to extract connections", exc_info=True)
             raise
         
+    def iter_connections(self, email, password):
+        # Library entry point: yields each connection as soon as it is loaded,
+        # never prompts on stdin and does not write any file
+        self.email = email
+        self.password = password
+        self.interactive = False
+        try:
+            self.setup_driver()
+            self.login(email, password)
+            self.navigate_to_connections()
+            yield from self.iter_scroll_connections()
+            
+        finally:
+            if self.driver and not self.keep_browser_open:
+                self.close_driver()
+        
     def save_to_file(self, output_file):
         try:
             logging.info(f"Saving connections to {output_file}...")
@@ -259,7 +424,24 @@ class LinkedInExtractor:
             logging.error("Failed to save connections to file", exc_info=True)
             raise
         
+    def close_driver(self):
+        if self.daemon_lock:
+            # Attached browsers belong to the daemon, just hand the slot back
+            release_slot_lock(self.daemon_lock)
+            self.daemon_lock = None
+        else:
+            self.driver.quit()
+        self.driver = None
+        
+    def log_metrics(self):
+        recycles = self.metrics["browser_recycles"]
+        logging.info(f"Run metrics: {len(recycles)} browser recycles")
+        for recycle in recycles:
+            logging.info(f"  {recycle['recycled_at']} - {recycle['reason']} (resumed at {recycle['resume_url']}, took {recycle['duration_seconds']}s)")
+
     def run(self, email, password, output_file):
+        self.email = email
+        self.password = password
         try:
             self.setup_driver()
             self.login(email, password)
@@ -274,16 +456,16 @@ class LinkedInExtractor:
                 input("Press Enter when ready to continue with extraction...")
             
             self.scroll_and_load_connections()
-            self.extract_connections()
             self.save_to_file(output_file)
             
         except Exception as e:
             logging.error("Application error occurred", exc_info=True)
             
         finally:
+            self.log_metrics()
             if self.driver and not self.keep_browser_open:
                 logging.info("Closing browser")
-                self.driver.quit()
+                self.close_driver()
             elif self.driver and self.keep_browser_open:
                 logging.info("Extraction complete. Browser kept open for final inspection.")
                 input("Press Enter to close browser and exit...")
@@ -296,8 +478,23 @@ def main():
                        help="Run browser in headless mode")
     parser.add_argument("--keep-browser-open", action="store_true", 
                        help="Keep browser open after completion for debugging")
+    parser.add_argument("--max-browser-memory-mb", type=int, default=config.WATCHDOG_MAX_RSS_MB,
+                       help="Relaunch the browser when its memory usage exceeds this limit (Linux only)")
+    parser.add_argument("--attach", action="store_true",
+                       help="Use a warm browser from browser_daemon.py instead of launching one")
+    parser.add_argument("--shard", action="append", default=[],
+                       help="Extract the slice of connections matching this people search filter, "
+                            "e.g. 'geoUrn=[\"103644278\"]' (repeatable, enables sharded mode)")
+    parser.add_argument("--workers", type=int, default=config.SHARD_WORKERS,
+                       help="Number of browsers extracting shards in parallel")
+    parser.add_argument("--max-requests", type=int, default=config.SHARD_MAX_REQUESTS,
+                       help="Page requests shared by all shard workers")
+    add_verbosity_arguments(parser)
     
     args = parser.parse_args()
+    if args.shard and args.keep_browser_open:
+        parser.error("--keep-browser-open cannot be used with --shard, the workers' browsers are closed when their shard is done")
+    setup_logging(get_verbosity(args))
     
     # Try to get credentials from environment variables
     email = os.getenv('LINKEDIN_EMAIL')
@@ -312,7 +509,17 @@ def main():
         if not password:
             password = getpass.getpass("Enter your LinkedIn password: ")
     
-    extractor = LinkedInExtractor(headless=args.headless, keep_browser_open=args.keep_browser_open)
+    if args.shard:
+        # Imported here since the sharded extractor builds on this module
+        from sharded_extractor import ShardedConnectionsExtractor
+        extractor = ShardedConnectionsExtractor(args.shard, headless=args.headless, attach=args.attach,
+                                                workers=args.workers, max_requests=args.max_requests,
+                                                max_browser_memory_mb=args.max_browser_memory_mb)
+        extractor.run(email, password, args.output_file)
+        return
+    
+    extractor = LinkedInExtractor(headless=args.headless, keep_browser_open=args.keep_browser_open,
+                                    max_browser_memory_mb=args.max_browser_memory_mb, attach=args.attach)
     extractor.run(email, password, args.output_file)
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import json
+import time
+import argparse
+import logging
+from profile_urls import canonicalize_profile_url
+from progress import setup_logging, add_verbosity_arguments, get_verbosity
+from export_reader import ExportReader
+
+# Written by the merger itself, never merged as regular fields
+MERGE_METADATA_FIELDS = ("profile_url", "last_seen_at", "field_seen_at")
+
+
+class ExportMerger:
+    def __init__(self):
+        # Blocking key is the canonical profile URL, so every record is compared
+        # only against the one entry in its hash bucket and the merge stays linear
+        self.people = {}
+        self.field_timestamps = {}
+        self.records_read = 0
+        self.records_skipped = 0
+        self.source_files = []
+
+    def add_record(self, record, extracted_at):
+        self.records_read += 1
+
+        profile_url = canonicalize_profile_url(record.get("profile_url"))
+        if not profile_url:
+            self.records_skipped += 1
+            return
+
+        person = self.people.get(profile_url)
+        if person is None:
+            person = self.people[profile_url] = {"profile_url": profile_url}
+            self.field_timestamps[profile_url] = {}
+        timestamps = self.field_timestamps[profile_url]
+
+        # Records from an earlier merge carry the time each field was last seen
+        field_seen_at = record.get("field_seen_at") or {}
+
+        # Keep the freshest non-empty value of every field
+        for field, value in record.items():
+            if field in MERGE_METADATA_FIELDS or value in (None, ""):
+                continue
+            seen_at = field_seen_at.get(field) or extracted_at
+            if field not in timestamps or seen_at >= timestamps[field]:
+                person[field] = value
+                timestamps[field] = seen_at
+
+        last_seen_at = record.get("last_seen_at") or extracted_at
+        if last_seen_at > person.get("last_seen_at", ""):
+            person["last_seen_at"] = last_seen_at
+
+    def add_file(self, path):
+        try:
+            logging.info(f"Reading {path}...")
+            records_before = self.records_read
+            with ExportReader(path) as reader:
+                # extracted_at uses "%Y-%m-%d %H:%M:%S", which orders correctly as a string
+                extracted_at = reader.metadata.get("extracted_at", "")
+                for record in reader:
+                    self.add_record(record, extracted_at)
+
+            self.source_files.append(path)
+            logging.info(f"Read {self.records_read - records_before} records from {path}")
+
+        except Exception as e:
+            logging.error(f"Failed to read export {path}", exc_info=True)
+            raise
+
+    def save_to_file(self, output_file):
+        try:
+            logging.info(f"Saving merged contacts to {output_file}...")
+
+            data = {
+                "total_contacts": len(self.people),
+                "merged_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "source_files": self.source_files,
+                "contacts": [dict(person, field_seen_at=self.field_timestamps[profile_url])
+                             for profile_url, person in self.people.items()]
+            }
+
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            logging.info(f"Merged {self.records_read} records into {len(self.people)} unique people "
+                         f"({self.records_skipped} records without a profile URL skipped)")
+
+        except Exception as e:
+            logging.error("Failed to save merged contacts to file", exc_info=True)
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge extractor exports, resolving duplicate people by profile URL")
+    parser.add_argument("input_files", nargs="+", help="Export JSON files to merge")
+    parser.add_argument("--output-file", default=None, help="Output JSON file name")
+    add_verbosity_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging(get_verbosity(args))
+
+    if not args.output_file:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        args.output_file = f"merged_contacts_{timestamp}.json"
+
+    merger = ExportMerger()
+    for path in args.input_files:
+        merger.add_file(path)
+    merger.save_to_file(args.output_file)
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@ import time
 import argparse
 import getpass
 import logging
-import sys
 import shutil
 import os
 from urllib.parse import urlparse, parse_qs
@@ -16,6 +15,13 @@ from selenium.webdriver.firefox.options import Options
 from webdriver_manager.firefox import GeckoDriverManager
 from selenium.webdriver.firefox.service import Service
 import config
+from errors import VerificationCodeRequired, FirefoxNotFound
+from browser_watchdog import BrowserWatchdog
+from browser_daemon import attach_to_daemon, release_slot_lock
+from profile_urls import canonicalize_profile_url
+from progress import ProgressReporter, setup_logging, add_verbosity_arguments, get_verbosity
+from wait_controller import AdaptiveWaitController, parse_count
+from profile_enricher import ProfileCache, ProfileEnricher
 
 try:
     from dotenv import load_dotenv
@@ -23,16 +29,45 @@ try:
 except ImportError:
     logging.warning("python-dotenv not installed. Install with: pip install python-dotenv")
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 class ProfileContactsExtractor:
-    def __init__(self, headless=False, keep_browser_open=False):
+    def __init__(self, headless=False, keep_browser_open=False, max_browser_memory_mb=None,
+                 verification_code_callback=None, attach=False, enrich=False, enrich_workers=None,
+                 cache_ttl=None):
         self.driver = None
         self.headless = headless
         self.keep_browser_open = keep_browser_open
+        self.verification_code_callback = verification_code_callback
+        self.interactive = True
+        self.attach = attach
+        self.daemon_lock = None
+        self.enrich = enrich
+        self.enrich_workers = enrich_workers
+        self.cache_ttl = cache_ttl
+        self.request_budget = None
+        self.budget_exhausted = False
         self.contacts = []
+        self.seen_profile_urls = set()
+        self.progress = None
+        # Set by callers running several extractors at once so they report on one status line
+        self.shared_progress = None
+        self.email = None
+        self.password = None
+        # Cookies of a browser that is already logged in, tried before a password login
+        self.session_cookies = None
+        self.watchdog = BrowserWatchdog(self, max_rss_mb=max_browser_memory_mb)
+        self.metrics = {"browser_recycles": self.watchdog.recycles}
+        self.wait_controller = AdaptiveWaitController()
         
     def setup_driver(self):
+        if self.attach:
+            attached = attach_to_daemon()
+            if attached:
+                self.driver, self.daemon_lock = attached
+                # The daemon keeps its own browsers healthy
+                self.watchdog.enabled = False
+                return
+            logging.warning("Falling back to launching a new browser")
+            
         try:
             logging.info("Setting up Firefox driver...")
             
@@ -51,8 +86,7 @@ class ProfileContactsExtractor:
                     break
             
             if not firefox_binary:
-                logging.error("Firefox not found. Please install Firefox browser.")
-                sys.exit(1)
+                raise FirefoxNotFound("Firefox not found. Please install Firefox browser.")
             
             logging.info(f"Using Firefox binary: {firefox_binary}")
             
@@ -73,7 +107,21 @@ class ProfileContactsExtractor:
             logging.error("Failed to setup Firefox driver", exc_info=True)
             raise
         
+    def get_verification_code(self):
+        if self.verification_code_callback:
+            return self.verification_code_callback()
+        if not self.interactive:
+            raise VerificationCodeRequired("Verification code required but no verification_code_callback was given")
+        return input("Enter the verification code: ")
+        
     def login(self, email, password):
+        if self.daemon_lock and self.driver.get_cookie("li_at"):
+            logging.info("Attached browser is already logged in")
+            return
+            
+        if self.session_cookies and self.restore_session():
+            return
+            
         try:
             logging.info("Navigating to LinkedIn login page...")
             self.driver.get(config.LOGIN_URL)
@@ -93,14 +141,17 @@ class ProfileContactsExtractor:
             
             # Check for verification code requirement
             try:
-                # Wait a bit to see if verification is required
-                time.sleep(3)
+                # Wait until either the verification form or the logged in page shows up
+                self.wait_controller.wait_until(
+                    lambda: self.driver.find_elements(By.CSS_SELECTOR, "input[name='pin']")
+                    or self.driver.find_elements(By.CLASS_NAME, "global-nav"),
+                    kind="login")
                 
                 # Check for verification code input field
                 verification_elements = self.driver.find_elements(By.CSS_SELECTOR, "input[name='pin']")
                 if verification_elements:
                     logging.info("Verification code required. Please check your email/phone for the code.")
-                    verification_code = input("Enter the verification code: ")
+                    verification_code = self.get_verification_code()
                     
                     verification_field = verification_elements[0]
                     verification_field.send_keys(verification_code)
@@ -115,6 +166,9 @@ class ProfileContactsExtractor:
                 wait.until(EC.presence_of_element_located((By.CLASS_NAME, "global-nav")))
                 logging.info("Login successful!")
                 
+            except VerificationCodeRequired:
+                raise
+                
             except Exception as verification_error:
                 # If verification check fails, try to continue with normal login flow
                 logging.warning("Verification check failed, attempting normal login flow", exc_info=True)
@@ -125,13 +179,37 @@ class ProfileContactsExtractor:
             logging.error("Login failed", exc_info=True)
             raise
         
+    def restore_session(self):
+        try:
+            logging.info("Reusing an existing LinkedIn session...")
+            # Cookies can only be set for the domain the browser is on
+            self.driver.get(config.FEED_URL)
+            for cookie in self.session_cookies:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    logging.debug("Could not set cookie %s", cookie.get("name"), exc_info=True)
+            
+            self.driver.get(config.FEED_URL)
+            if self.wait_controller.wait_until(lambda: self.driver.find_elements(By.CLASS_NAME, "global-nav"),
+                                               kind="login"):
+                logging.info("Login successful!")
+                return True
+            logging.warning("Session cookies were not accepted, logging in with the password")
+            
+        except Exception as e:
+            logging.warning("Failed to reuse the session, logging in with the password", exc_info=True)
+        return False
+        
     def navigate_to_profile(self, profile_url):
         try:
             logging.info(f"Navigating to profile: {profile_url}")
             self.driver.get(profile_url)
             
-            # Just wait a moment for page to load
-            time.sleep(3)
+            # Wait for the page to finish loading
+            self.wait_controller.wait_until(
+                lambda: self.driver.execute_script("return document.readyState") == "complete",
+                kind="navigation")
             logging.info("Profile loaded successfully!")
             
         except Exception as e:
@@ -155,9 +233,9 @@ class ProfileContactsExtractor:
             contacts_link = None
             for selector in contacts_selectors:
                 try:
-                    logging.info(f"Trying selector: {selector}")
+                    logging.debug("Trying selector: %s", selector)
                     elements = self.driver.find_elements(By.XPATH, selector)
-                    logging.info(f"Found {len(elements)} elements with selector")
+                    logging.debug("Found %d elements with selector", len(elements))
                     
                     for element in elements:
                         if element.is_displayed() and element.is_enabled():
@@ -169,7 +247,7 @@ class ProfileContactsExtractor:
                     if contacts_link:
                         break
                 except Exception as selector_error:
-                    logging.warning(f"Selector failed: {selector_error}")
+                    logging.debug("Selector failed: %s", selector_error)
                     continue
             
             if not contacts_link:
@@ -207,20 +285,41 @@ class ProfileContactsExtractor:
             logging.error("Failed to click contacts link", exc_info=True)
             raise
             
-    def load_all_contacts_with_pagination(self):
+    def get_expected_result_count(self):
+        # The results header reads e.g. "About 1,234 results"
+        header_selectors = [
+            ".search-results-container h2",
+            "h2.pb2"
+        ]
+        for selector in header_selectors:
+            try:
+                for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    count = parse_count(element.text)
+                    if count:
+                        logging.info(f"Page reports {count} results")
+                        return count
+            except Exception:
+                continue
+        return None
+            
+    def iter_all_contacts_with_pagination(self):
         try:
             logging.info("Loading all contacts with pagination...")
             
             page_count = 1
+            self.progress = self.shared_progress or ProgressReporter("Contacts")
             
             while True:
-                logging.info(f"Processing page {page_count}...")
+                logging.debug("Processing page %d...", page_count)
                 
                 # Wait for current page to load
-                time.sleep(config.SCROLL_PAUSE_TIME)
+                self.wait_controller.wait_until(lambda: self.driver.find_elements(By.XPATH, "//*[@class='mb1']"),
+                                                kind="render")
+                if page_count == 1 and not self.shared_progress:
+                    self.progress.set_total(self.get_expected_result_count())
                 
                 # Extract contacts from current page
-                self.extract_contacts_from_current_page(page_count)
+                yield from self.iter_contacts_from_current_page(page_count)
                 
                 # Look for next page button
                 next_button = None
@@ -250,9 +349,18 @@ class ProfileContactsExtractor:
                 except Exception as e:
                     logging.warning(f"Error looking for next button: {e}")
                 
+                if next_button and self.request_budget and not self.request_budget.acquire():
+                    logging.warning(f"Request budget exhausted, stopping after page {page_count}")
+                    self.budget_exhausted = True
+                    break
+                
                 if next_button:
                     try:
-                        logging.info(f"Found next page button, clicking to load page {page_count + 1}...")
+                        logging.debug("Found next page button, clicking to load page %d...", page_count + 1)
+                        
+                        # Any result of the current page goes stale once the next page renders
+                        previous_results = self.driver.find_elements(By.XPATH, "//*[@class='mb1']")[:1]
+                        previous_url = self.driver.current_url
                         
                         # Scroll to button and click
                         self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
@@ -260,29 +368,48 @@ class ProfileContactsExtractor:
                         next_button.click()
                         
                         # Wait for page to load
-                        time.sleep(config.SCROLL_PAUSE_TIME)
+                        if previous_results:
+                            self.wait_controller.wait_until(lambda: EC.staleness_of(previous_results[0])(self.driver))
+                        else:
+                            self.wait_controller.wait_until(lambda: self.driver.current_url != previous_url)
                         page_count += 1
                         
                     except Exception as click_error:
                         logging.warning(f"Failed to click next button: {click_error}")
                         break
+                    
+                    # Relaunch the browser between pages if it has grown too large or slow. A failed
+                    # recycle leaves no usable browser, so it ends the run instead of looking like the last page
+                    try:
+                        self.watchdog.check_and_recycle()
+                    except Exception as e:
+                        logging.error(f"Failed to recycle browser after page {page_count - 1}", exc_info=True)
+                        raise
                 else:
                     logging.info("No more pages found. Pagination complete.")
                     break
                     
+            if not self.shared_progress:
+                self.progress.finish()
             logging.info(f"Finished loading all contacts. Total pages processed: {page_count}")
                 
         except Exception as e:
             logging.error("Failed to load contacts with pagination", exc_info=True)
             raise
             
+    def load_all_contacts_with_pagination(self):
+        self.contacts.extend(self.iter_all_contacts_with_pagination())
+            
     def extract_contacts_from_current_page(self, page_number):
+        self.contacts.extend(self.iter_contacts_from_current_page(page_number))
+            
+    def iter_contacts_from_current_page(self, page_number):
         try:
-            logging.info(f"Extracting contacts from page {page_number}...")
+            logging.debug("Extracting contacts from page %d...", page_number)
             
             # Find all mb1 containers on current page
             mb1_containers = self.driver.find_elements(By.XPATH, "//*[@class='mb1']")
-            logging.info(f"Found {len(mb1_containers)} mb1 containers on page {page_number}")
+            logging.debug("Found %d mb1 containers on page %d", len(mb1_containers), page_number)
             
             page_contacts = 0
             
@@ -295,13 +422,13 @@ class ProfileContactsExtractor:
                         continue  # Skip if no profile link found
                     
                     profile_link = profile_links[0]  # Take the first one
-                    profile_url = profile_link.get_attribute("href")
+                    profile_url = canonicalize_profile_url(profile_link.get_attribute("href"))
                     
                     if not profile_url:
                         continue
                     
                     # Check if we already have this contact (avoid duplicates)
-                    if any(contact['profile_url'] == profile_url for contact in self.contacts):
+                    if profile_url in self.seen_profile_urls:
                         continue
                     
                     # Extract name from the link text
@@ -351,7 +478,7 @@ class ProfileContactsExtractor:
                                 location = location_text
                                 
                     except Exception as div_error:
-                        logging.warning(f"Failed to extract div info for {name}: {div_error}")
+                        logging.warning("Failed to extract div info for %s: %s", name, div_error)
                     
                     if not name or not profile_url:
                         continue
@@ -365,15 +492,19 @@ class ProfileContactsExtractor:
                         "profile_url": profile_url
                     }
                     
-                    self.contacts.append(contact_data)
+                    self.seen_profile_urls.add(profile_url)
                     page_contacts += 1
-                    logging.info(f"Page {page_number} - Extracted: {name} | Alt: {alternative_name} | Job: {job_position} | Location: {location}")
+                    yield contact_data
+                    logging.debug("Page %d - Extracted: %s | Alt: %s | Job: %s | Location: %s",
+                                  page_number, name, alternative_name, job_position, location)
                     
                 except Exception as e:
                     logging.warning("Failed to extract data from mb1 container", exc_info=True)
                     continue
                     
-            logging.info(f"Extracted {page_contacts} new contacts from page {page_number}. Total so far: {len(self.contacts)}")
+            logging.debug("Extracted %d new contacts from page %d. Total so far: %d", page_contacts, page_number, len(self.seen_profile_urls))
+            if self.progress:
+                self.progress.update(records=page_contacts, pages=1)
             
         except Exception as e:
             logging.error(f"Failed to extract contacts from page {page_number}", exc_info=True)
@@ -390,8 +521,8 @@ class ProfileContactsExtractor:
             for profile_link in profile_links:
                 try:
                     # Extract profile URL
-                    profile_url = profile_link.get_attribute("href")
-                    if not profile_url:
+                    profile_url = canonicalize_profile_url(profile_link.get_attribute("href"))
+                    if not profile_url or profile_url in self.seen_profile_urls:
                         continue
                     
                     # Extract name from the link text - look for spans with actual names
@@ -427,7 +558,8 @@ class ProfileContactsExtractor:
                     }
                     
                     self.contacts.append(contact_data)
-                    logging.info(f"Extracted contact: {name} | URL: {profile_url}")
+                    self.seen_profile_urls.add(profile_url)
+                    logging.debug("Extracted contact: %s | URL: %s", name, profile_url)
                     
                 except Exception as e:
                     logging.warning("Failed to extract data from profile link", exc_info=True)
@@ -459,7 +591,75 @@ class ProfileContactsExtractor:
             logging.error("Failed to save contacts to file", exc_info=True)
             raise
         
+    def create_enrichment_browser(self):
+        browser = ProfileContactsExtractor(headless=self.headless, attach=self.attach,
+                                           verification_code_callback=self.verification_code_callback)
+        browser.interactive = self.interactive
+        browser.setup_driver()
+        try:
+            browser.login(self.email, self.password)
+        except Exception:
+            # The enricher never sees this browser, so it has to be closed here
+            browser.close_driver()
+            raise
+        return browser
+        
+    def create_enricher(self):
+        # Browsers are only launched once a profile misses the cache
+        return ProfileEnricher(self.create_enrichment_browser, cache=ProfileCache(ttl=self.cache_ttl),
+                               workers=self.enrich_workers)
+        
+    def enrich_contacts(self):
+        logging.info(f"Enriching {len(self.contacts)} contacts with profile details...")
+        enricher = self.create_enricher()
+        try:
+            self.contacts = list(enricher.enrich(self.contacts))
+        finally:
+            enricher.close()
+        
+    def close_driver(self):
+        if self.daemon_lock:
+            # Attached browsers belong to the daemon, just hand the slot back
+            release_slot_lock(self.daemon_lock)
+            self.daemon_lock = None
+        else:
+            self.driver.quit()
+        self.driver = None
+        
+    def log_metrics(self):
+        recycles = self.metrics["browser_recycles"]
+        logging.info(f"Run metrics: {len(recycles)} browser recycles")
+        for recycle in recycles:
+            logging.info(f"  {recycle['recycled_at']} - {recycle['reason']} (resumed at {recycle['resume_url']}, took {recycle['duration_seconds']}s)")
+
+    def iter_contacts(self, email, password, profile_url):
+        # Library entry point: yields each contact as soon as it is extracted,
+        # never prompts on stdin and does not write any file
+        self.email = email
+        self.password = password
+        self.interactive = False
+        enricher = None
+        try:
+            self.setup_driver()
+            self.login(email, password)
+            self.navigate_to_profile(profile_url)
+            self.click_contacts_link()
+            
+            contacts = self.iter_all_contacts_with_pagination()
+            if self.enrich:
+                enricher = self.create_enricher()
+                contacts = enricher.enrich(contacts)
+            yield from contacts
+            
+        finally:
+            if enricher:
+                enricher.close()
+            if self.driver and not self.keep_browser_open:
+                self.close_driver()
+        
     def run(self, email, password, profile_url, output_file):
+        self.email = email
+        self.password = password
         try:
             self.setup_driver()
             self.login(email, password)
@@ -472,16 +672,20 @@ class ProfileContactsExtractor:
             
             self.click_contacts_link()
             self.load_all_contacts_with_pagination()
+            if self.enrich:
+                self.enrich_contacts()
             self.save_to_file(output_file, profile_url)
             
         except Exception as e:
             logging.error("Application error occurred", exc_info=True)
             
         finally:
+            self.log_metrics()
             if self.driver:
                 logging.info("Extraction complete. Browser kept open for inspection.")
-                input("Press Enter to close browser and exit...")
-                self.driver.quit()
+                if self.interactive and not self.daemon_lock:
+                    input("Press Enter to close browser and exit...")
+                self.close_driver()
 
 def main():
     parser = argparse.ArgumentParser(description="Extract contacts from a LinkedIn profile")
@@ -489,8 +693,15 @@ def main():
     parser.add_argument("--output-file", default=None, help="Output JSON file name")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
     parser.add_argument("--keep-browser-open", action="store_true", help="Keep browser open after completion for debugging")
+    parser.add_argument("--max-browser-memory-mb", type=int, default=config.WATCHDOG_MAX_RSS_MB, help="Relaunch the browser when its memory usage exceeds this limit (Linux only)")
+    parser.add_argument("--attach", action="store_true", help="Use a warm browser from browser_daemon.py instead of launching one")
+    parser.add_argument("--enrich", action="store_true", help="Visit each contact's profile to add headline, location and about details")
+    parser.add_argument("--enrich-workers", type=int, default=config.ENRICH_WORKERS, help="Number of browsers visiting profiles in parallel")
+    parser.add_argument("--cache-ttl-days", type=float, default=config.ENRICH_CACHE_TTL / 86400, help="Reuse cached profile details younger than this")
+    add_verbosity_arguments(parser)
     
     args = parser.parse_args()
+    setup_logging(get_verbosity(args))
     
     # Generate output filename if not provided
     if not args.output_file:
@@ -510,7 +721,10 @@ def main():
         if not password:
             password = getpass.getpass("Enter your LinkedIn password: ")
     
-    extractor = ProfileContactsExtractor(headless=args.headless, keep_browser_open=args.keep_browser_open)
+    extractor = ProfileContactsExtractor(headless=args.headless, keep_browser_open=args.keep_browser_open,
+                                         max_browser_memory_mb=args.max_browser_memory_mb, attach=args.attach,
+                                         enrich=args.enrich, enrich_workers=args.enrich_workers,
+                                         cache_ttl=args.cache_ttl_days * 86400)
     extractor.run(email, password, args.profile_url, args.output_file)
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import config
+from profile_urls import canonicalize_profile_url
+
+
+class ProfileCache:
+    def __init__(self, cache_dir=None, ttl=None, max_entries=None):
+        self.cache_dir = cache_dir or config.ENRICH_CACHE_DIR
+        self.ttl = ttl if ttl is not None else config.ENRICH_CACHE_TTL
+        self.max_entries = max_entries or config.ENRICH_CACHE_MAX_ENTRIES
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.entry_count = sum(1 for name in os.listdir(self.cache_dir) if name.endswith(".json"))
+
+    def path_for(self, profile_url):
+        key = hashlib.sha1(profile_url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, profile_url):
+        path = self.path_for(profile_url)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        if time.time() - entry["fetched_at"] > self.ttl:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        # Reads refresh the mtime so eviction drops the least recently used entries
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self.lock:
+            self.hits += 1
+        return entry["details"]
+
+    def put(self, profile_url, details):
+        path = self.path_for(profile_url)
+        entry = {"profile_url": profile_url, "fetched_at": time.time(), "details": details}
+
+        with self.lock:
+            is_new = not os.path.exists(path)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+
+            if is_new:
+                self.entry_count += 1
+                if self.entry_count > self.max_entries:
+                    self.evict()
+
+    def evict(self):
+        # Evict down to 90% of the limit so the directory scan is not repeated on every write
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+
+        entries.sort()
+        target = int(self.max_entries * 0.9)
+        removed = 0
+        for _, path in entries[:max(0, len(entries) - target)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+
+        self.entry_count = len(entries) - removed
+        logging.info(f"Evicted {removed} profiles from the cache ({self.entry_count} left)")
+
+
+class ProfileEnricher:
+    def __init__(self, browser_factory, cache=None, workers=None):
+        # browser_factory returns a logged-in extractor; each worker thread gets its own
+        self.browser_factory = browser_factory
+        self.cache = cache or ProfileCache()
+        self.workers = workers or config.ENRICH_WORKERS
+        self.local = threading.local()
+        self.browsers = []
+        self.browsers_lock = threading.Lock()
+        self.fetched = 0
+        self.failed = 0
+        # Set once a browser could not be started, later cache misses are passed through unenriched
+        self.browser_failed = False
+
+    def get_browser(self):
+        browser = getattr(self.local, "browser", None)
+        if browser is None:
+            try:
+                browser = self.browser_factory()
+            except Exception:
+                self.browser_failed = True
+                raise
+            self.local.browser = browser
+            with self.browsers_lock:
+                self.browsers.append(browser)
+        return browser
+
+    def fetch_details(self, driver, profile_url):
+        driver.get(profile_url)
+        WebDriverWait(driver, config.WAIT_TIMEOUT).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+
+        def first_text(by, selector):
+            for element in driver.find_elements(by, selector):
+                text = element.text.strip()
+                if text:
+                    return text
+            return ""
+
+        return {
+            "full_name": first_text(By.TAG_NAME, "h1"),
+            "headline": first_text(By.CSS_SELECTOR, ".text-body-medium.break-words"),
+            "location": first_text(By.CSS_SELECTOR, ".text-body-small.inline.t-black--light.break-words"),
+            "about": first_text(By.XPATH, "//section[.//div[@id='about']]//div[contains(@class, 'inline-show-more-text')]//span[@aria-hidden='true']"),
+            "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def enrich_one(self, contact):
+        profile_url = canonicalize_profile_url(contact.get("profile_url"))
+        if not profile_url:
+            return contact
+
+        details = self.cache.get(profile_url)
+        if details is None:
+            if self.browser_failed:
+                return contact
+            try:
+                details = self.fetch_details(self.get_browser().driver, profile_url)
+                self.cache.put(profile_url, details)
+                self.fetched += 1
+            except Exception:
+                if self.browser_failed:
+                    logging.error("Failed to start an enrichment browser, remaining uncached contacts are not enriched",
+                                  exc_info=True)
+                else:
+                    logging.warning(f"Failed to enrich {profile_url}", exc_info=True)
+                self.failed += 1
+                return contact
+
+        return dict(contact, details=details)
+
+    def enrich(self, contacts):
+        # Keeps a bounded window of in-flight profiles and yields results in input order
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="enrich") as executor:
+            pending = deque()
+            for contact in contacts:
+                pending.append(executor.submit(self.enrich_one, contact))
+                if len(pending) >= self.workers * 4:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        logging.info(f"Enrichment finished: {self.cache.hits} from cache, {self.fetched} fetched, {self.failed} failed")
+
+    def close(self):
+        for browser in self.browsers:
+            try:
+                browser.close_driver()
+            except Exception:
+                logging.warning("Failed to close enrichment browser", exc_info=True)
+        self.browsers = []
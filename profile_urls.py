@@ -0,0 +1,32 @@
+from urllib.parse import urlparse, unquote
+
+CANONICAL_HOST = "www.linkedin.com"
+MEMBER_ID_PREFIXES = ("ACoAA", "ACwAA")
+
+
+def canonicalize_profile_url(url):
+    # Collapse the variants LinkedIn hands out for the same person:
+    # query strings (?miniProfileUrn=...), fragments, trailing slashes,
+    # locale subdomains (es.linkedin.com) and mixed-case or percent-encoded vanity slugs
+    if not url:
+        return url
+
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url.lstrip("/")
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if not (host == "linkedin.com" or host.endswith(".linkedin.com")):
+        return url
+
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    if len(segments) >= 2 and segments[0].lower() == "in":
+        slug = unquote(segments[1])
+        # Vanity slugs are case-insensitive, opaque member ids (/in/ACoAAAbc123) are not
+        if not slug.startswith(MEMBER_ID_PREFIXES):
+            slug = slug.lower()
+        return f"https://{CANONICAL_HOST}/in/{slug}"
+
+    path = "/".join(segments)
+    return f"https://{CANONICAL_HOST}/{path}"
@@ -0,0 +1,140 @@
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+import config
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+VERBOSITY_LEVELS = {
+    0: logging.WARNING,
+    1: logging.INFO,
+    2: logging.DEBUG
+}
+
+# Log records and the status line share the terminal, both write under this lock
+_output_lock = threading.Lock()
+_active_status = {"line": "", "stream": None}
+
+
+class StatusLineHandler(logging.StreamHandler):
+    def emit(self, record):
+        with _output_lock:
+            status_line = _active_status["line"]
+            if status_line and _active_status["stream"] is self.stream:
+                self.stream.write("\r\033[K")
+            super().emit(record)
+            if status_line and _active_status["stream"] is self.stream:
+                self.stream.write(status_line)
+                self.stream.flush()
+
+
+class DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the message and renders tracebacks on the calling
+    # thread. Passing the record through unchanged leaves that to the listener thread.
+    # Log arguments must not be mutated after the call, which holds for the ints and
+    # strings logged here
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(verbosity=1):
+    level = VERBOSITY_LEVELS.get(verbosity, logging.DEBUG if verbosity > 2 else logging.WARNING)
+
+    handler = StatusLineHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    # Callers only pay for putting the record on a queue, formatting and
+    # writing happen on the listener thread
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(DeferredFormatQueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def add_verbosity_arguments(parser):
+    parser.add_argument("-v", "--verbose", action="store_true",
+                       help="Log every extracted record and selector attempt")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                       help="Only log warnings and errors")
+
+
+def get_verbosity(args):
+    if args.quiet:
+        return 0
+    if args.verbose:
+        return 2
+    return 1
+
+
+class ProgressReporter:
+    def __init__(self, label, total=None, interval=None, stream=None):
+        self.label = label
+        self.total = total
+        self.interval = interval if interval is not None else config.PROGRESS_INTERVAL
+        self.stream = stream or sys.stderr
+        self.is_tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.records = 0
+        self.pages = 0
+        self.started_at = time.monotonic()
+        self.last_render = 0
+        self.lock = threading.Lock()
+        self.enabled = logging.getLogger().isEnabledFor(logging.INFO)
+
+    def set_total(self, total):
+        self.total = total
+
+    def update(self, records=0, pages=0):
+        # May be shared by several worker threads
+        with self.lock:
+            self.records += records
+            self.pages += pages
+            now = time.monotonic()
+            if now - self.last_render < self.interval:
+                return
+            self.last_render = now
+        self.render()
+
+    def format_status(self):
+        elapsed = time.monotonic() - self.started_at
+        rate = self.records / elapsed if elapsed > 0 else 0
+        status = f"{self.label}: {self.records} records, {self.pages} pages, {rate:.1f} records/s"
+        if self.total:
+            status += f" ({self.records}/{self.total})"
+            if rate > 0 and self.total > self.records:
+                eta = int((self.total - self.records) / rate)
+                status += f", ETA {eta // 60}m{eta % 60:02d}s"
+        return status
+
+    def render(self):
+        if not self.enabled:
+            return
+        status = self.format_status()
+        if not self.is_tty:
+            logging.info(status)
+            return
+        with _output_lock:
+            _active_status["line"] = status
+            _active_status["stream"] = self.stream
+            self.stream.write("\r\033[K" + status)
+            self.stream.flush()
+
+    def finish(self):
+        self.render()
+        if self.is_tty and self.enabled:
+            with _output_lock:
+                _active_status["line"] = ""
+                _active_status["stream"] = None
+                self.stream.write("\n")
+                self.stream.flush()
@@ -0,0 +1,202 @@
+import json
+import time
+import logging
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+import config
+from linkedin_extractor import LinkedInExtractor
+from profile_contacts_extractor import ProfileContactsExtractor
+from progress import ProgressReporter
+
+
+class RequestBudget:
+    # Shared by all shard workers: caps the total page loads and spaces them out
+    def __init__(self, max_requests=None, min_interval=None):
+        self.max_requests = max_requests or config.SHARD_MAX_REQUESTS
+        self.min_interval = min_interval if min_interval is not None else config.SHARD_MIN_REQUEST_INTERVAL
+        self.used = 0
+        self.last_request = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.used >= self.max_requests:
+                return False
+            delay = self.last_request + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.used += 1
+            self.last_request = time.monotonic()
+            return True
+
+
+def build_shard_url(shard_filter):
+    # shard_filter is a people search filter such as 'geoUrn=["103644278"]',
+    # applied on top of the 1st degree network filter
+    key, _, value = shard_filter.partition("=")
+    return f"{config.PEOPLE_SEARCH_URL}?network=%5B%22F%22%5D&origin=FACETED_SEARCH&{quote(key)}={quote(value)}"
+
+
+class ShardedConnectionsExtractor:
+    def __init__(self, shard_filters, headless=False, attach=False, workers=None, max_requests=None,
+                 max_browser_memory_mb=None, verification_code_callback=None):
+        self.shard_filters = shard_filters
+        self.headless = headless
+        self.attach = attach
+        self.max_browser_memory_mb = max_browser_memory_mb
+        self.verification_code_callback = verification_code_callback
+        # Workers only fall back to a password login when the shared session is rejected,
+        # several of them may then ask for a code at once
+        self.prompt_lock = threading.Lock()
+        self.session_cookies = None
+        self.workers = workers or config.SHARD_WORKERS
+        self.request_budget = RequestBudget(max_requests=max_requests)
+        self.expected_total = None
+        self.shard_results = []
+        self.connections = []
+        self.progress = None
+
+    def get_verification_code(self):
+        with self.prompt_lock:
+            if self.verification_code_callback:
+                return self.verification_code_callback()
+            return input("Enter the verification code: ")
+        
+    def read_expected_total(self, email, password):
+        extractor = LinkedInExtractor(headless=self.headless, attach=self.attach,
+                                      verification_code_callback=self.get_verification_code)
+        extractor.interactive = False
+        try:
+            extractor.setup_driver()
+            extractor.login(email, password)
+            # Workers reuse this session so the account sees a single login instead of one per worker
+            self.session_cookies = extractor.driver.get_cookies()
+            self.request_budget.acquire()
+            extractor.navigate_to_connections()
+            self.expected_total = extractor.get_expected_connection_count()
+        finally:
+            if extractor.driver:
+                extractor.close_driver()
+
+    def extract_shard(self, shard_filter, email, password):
+        worker = ProfileContactsExtractor(headless=self.headless, attach=self.attach,
+                                          max_browser_memory_mb=self.max_browser_memory_mb,
+                                          verification_code_callback=self.get_verification_code)
+        worker.interactive = False
+        worker.session_cookies = self.session_cookies
+        # The watchdog logs in again with these when it relaunches the worker's browser
+        worker.email = email
+        worker.password = password
+        worker.request_budget = self.request_budget
+        worker.shared_progress = self.progress
+        connections = []
+        shard = {"filter": shard_filter, "expected": None, "extracted": 0, "complete": False}
+        try:
+            worker.setup_driver()
+            worker.login(email, password)
+
+            if not self.request_budget.acquire():
+                logging.warning(f"Request budget exhausted before shard {shard_filter} started")
+                return shard, connections
+            worker.driver.get(build_shard_url(shard_filter))
+            worker.wait_controller.wait_until(lambda: worker.driver.find_elements(By.XPATH, "//*[@class='mb1']"),
+                                              kind="navigation")
+            shard["expected"] = worker.get_expected_result_count()
+            if shard["expected"] and shard["expected"] > config.SEARCH_RESULT_LIMIT:
+                logging.warning(f"Shard {shard_filter} reports {shard['expected']} results but search only "
+                                f"returns {config.SEARCH_RESULT_LIMIT}, split it into narrower filters")
+
+            for contact in worker.iter_all_contacts_with_pagination():
+                connections.append({
+                    "name": contact["name"],
+                    "occupation": contact["job_position"],
+                    "location": contact["location"],
+                    "profile_url": contact["profile_url"]
+                })
+
+            shard["extracted"] = len(connections)
+            # Search never returns more than SEARCH_RESULT_LIMIT results, so an oversized shard is always partial
+            shard["complete"] = (not worker.budget_exhausted
+                                 and not (shard["expected"] and shard["expected"] > config.SEARCH_RESULT_LIMIT)
+                                 and not (shard["expected"] and len(connections) < shard["expected"]))
+            logging.info(f"Shard {shard_filter}: {len(connections)} connections (page reported {shard['expected']})")
+
+        except Exception as e:
+            logging.error(f"Shard {shard_filter} failed", exc_info=True)
+
+        finally:
+            if worker.driver:
+                worker.close_driver()
+
+        return shard, connections
+
+    def merge(self, shard_outputs):
+        seen_profile_urls = set()
+        for shard, connections in shard_outputs:
+            self.shard_results.append(shard)
+            for connection in connections:
+                # Filters may overlap, each person is kept once
+                if connection["profile_url"] in seen_profile_urls:
+                    continue
+                seen_profile_urls.add(connection["profile_url"])
+                self.connections.append(connection)
+
+    def check_coverage(self):
+        incomplete = [shard["filter"] for shard in self.shard_results if not shard["complete"]]
+        if incomplete:
+            logging.warning(f"Shards not fully extracted: {', '.join(incomplete)}")
+
+        if not self.expected_total:
+            logging.warning("Total connection count unknown, shard coverage could not be checked")
+            return
+        missing = self.expected_total - len(self.connections)
+        if missing > 0:
+            logging.warning(f"Shards cover {len(self.connections)} of {self.expected_total} connections, "
+                            f"{missing} are not matched by any shard filter")
+        else:
+            logging.info(f"Shards cover all {self.expected_total} connections")
+
+    def save_to_file(self, output_file):
+        try:
+            logging.info(f"Saving connections to {output_file}...")
+
+            data = {
+                "total_connections": len(self.connections),
+                "expected_connections": self.expected_total,
+                "extracted_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "shards": self.shard_results,
+                "connections": self.connections
+            }
+
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            logging.info(f"Successfully saved {len(self.connections)} connections to {output_file}")
+
+        except Exception as e:
+            logging.error("Failed to save connections to file", exc_info=True)
+            raise
+
+    def run(self, email, password, output_file):
+        try:
+            self.read_expected_total(email, password)
+            if self.expected_total:
+                logging.info(f"Page reports {self.expected_total} connections")
+
+            logging.info(f"Extracting {len(self.shard_filters)} shards with {self.workers} workers...")
+            # One status line for all workers; counts include duplicates between overlapping shards
+            self.progress = ProgressReporter("Connections", total=self.expected_total)
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard") as executor:
+                shard_outputs = list(executor.map(lambda shard_filter: self.extract_shard(shard_filter, email, password),
+                                                  self.shard_filters))
+            self.progress.finish()
+
+            self.merge(shard_outputs)
+            self.check_coverage()
+            logging.info(f"Used {self.request_budget.used} of {self.request_budget.max_requests} page requests")
+            self.save_to_file(output_file)
+
+        except Exception as e:
+            logging.error("Application error occurred", exc_info=True)
@@ -0,0 +1,94 @@
+import re
+import math
+import time
+import logging
+from collections import deque
+import config
+
+
+def parse_count(text):
+    # "1,234 Connections", "About 1.234 results" -> 1234
+    match = re.search(r"\d[\d,.\s]*", text or "")
+    if not match:
+        return None
+    digits = re.sub(r"\D", "", match.group(0))
+    return int(digits) if digits else None
+
+
+class AdaptiveWaitController:
+    def __init__(self, initial_latency=None, percentile=None, window=None,
+                 min_timeout=None, max_timeout=None):
+        self.initial_latency = initial_latency if initial_latency is not None else config.SCROLL_PAUSE_TIME
+        self.percentile = percentile if percentile is not None else config.ADAPTIVE_WAIT_PERCENTILE
+        self.min_timeout = min_timeout if min_timeout is not None else config.ADAPTIVE_WAIT_MIN_TIMEOUT
+        self.max_timeout = max_timeout if max_timeout is not None else config.ADAPTIVE_WAIT_MAX_TIMEOUT
+        self.window = window or config.ADAPTIVE_WAIT_WINDOW
+        # One window per kind of wait, so quick checks do not drag down the estimate for slow loads
+        self.latencies = {}
+        # Raised multiplicatively by timeouts so a few fast samples cannot pin the timeout low
+        self.timeout_floors = {}
+        self.batch_sizes = deque(maxlen=self.window)
+
+    def record_latency(self, seconds, kind="load"):
+        if kind not in self.latencies:
+            self.latencies[kind] = deque(maxlen=self.window)
+        self.latencies[kind].append(seconds)
+
+    def record_batch(self, size):
+        if size > 0:
+            self.batch_sizes.append(size)
+
+    def estimate_latency(self, kind="load"):
+        # Until there are a few samples the configured pause is the best guess
+        latencies = self.latencies.get(kind, ())
+        if len(latencies) < 3:
+            return self.initial_latency
+        ordered = sorted(latencies)
+        rank = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def timeout(self, kind="load"):
+        estimate = self.estimate_latency(kind) * config.ADAPTIVE_WAIT_SAFETY_FACTOR
+        estimate = max(estimate, self.timeout_floors.get(kind, 0))
+        return min(self.max_timeout, max(self.min_timeout, estimate))
+
+    def wait_until(self, condition, kind="load", expect_timeout=False):
+        # Returns as soon as the condition holds instead of sleeping a fixed pause.
+        # expect_timeout marks probes that often time out by design (end of list checks),
+        # those timeouts say nothing about latency and must not raise the timeout
+        timeout = self.timeout(kind)
+        start = time.monotonic()
+        while True:
+            try:
+                if condition():
+                    self.record_latency(time.monotonic() - start, kind)
+                    if kind in self.timeout_floors:
+                        self.timeout_floors[kind] *= config.ADAPTIVE_WAIT_FLOOR_DECAY
+                    return True
+            except Exception:
+                logging.debug("Wait condition raised, retrying", exc_info=True)
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                if expect_timeout:
+                    logging.debug("Probe for %s timed out after %.1fs", kind, elapsed)
+                    return False
+                # The real latency is at least the timeout. Recording it lets the estimate, and with the
+                # safety factor the next timeout, grow when the network slows down mid-run
+                self.record_latency(elapsed, kind)
+                self.timeout_floors[kind] = min(self.max_timeout, timeout * config.ADAPTIVE_WAIT_TIMEOUT_GROWTH)
+                logging.debug("Wait for %s timed out after %.1fs", kind, elapsed)
+                return False
+            time.sleep(min(config.ADAPTIVE_WAIT_POLL_INTERVAL, timeout - elapsed))
+
+    def typical_batch_size(self):
+        if not self.batch_sizes:
+            return config.ADAPTIVE_DEFAULT_BATCH_SIZE
+        ordered = sorted(self.batch_sizes)
+        return ordered[len(ordered) // 2]
+
+    def attempt_budget(self, expected_total):
+        # Enough attempts to load the expected total at the observed batch size,
+        # with slack for slow batches, plus the attempts allowed to stall at the end
+        expected_total = expected_total or config.MAX_EXPECTED_TOTAL
+        needed = math.ceil(expected_total / self.typical_batch_size())
+        return math.ceil(needed * config.ADAPTIVE_ATTEMPT_SLACK) + config.STALL_ATTEMPTS